@@ -10,7 +10,10 @@ import sys
 
 # Import the logic for the recommender system
 sys.path.append(os.path.abspath("scripts"))
-from recommender import recommend_by_mood, more_like_this, build_explanations
+from recommender import recommend_by_mood, more_like_this, rerank_mmr, build_explanations
+from collaborative import load_neighbours
+from cache import ResultCache, dataset_version, file_stamp
+from thumbs import is_proxied, thumb_url
 
 
 # Utilities
@@ -26,6 +29,21 @@ def upscale_mal_image(url):
     return url
 
 
+# Thumbnail proxy (scripts/image_proxy.py); hot-link MAL when unset
+IMAGE_PROXY = os.environ.get("MARS_IMAGE_PROXY", "")
+
+
+def card_image(url, width):
+    """
+    Poster URL for a card of `width` px, via the thumbnail proxy if configured.
+    Hosts the proxy doesn't allow (e.g. placeholder images) are hot-linked.
+    """
+    img = upscale_mal_image(url)
+    if IMAGE_PROXY and is_proxied(img):
+        return thumb_url(IMAGE_PROXY, img, width)
+    return img
+
+
 def fix_genre_list(x):
     if isinstance(x, list):
         return x
@@ -49,7 +67,7 @@ def rating_to_stars(r):
 
 def compute_match_score(row, mood, max_members):
     """Simple heuristic: rating + popularity + mood/genre alignment."""
-    score = (row["rating"] / 10) * 60
+    score = (row["weighted_rating"] / 10) * 60
 
     pop_factor = min(row["members"] / max_members, 1.0) if max_members else 0
     score += pop_factor * 20
@@ -74,16 +92,46 @@ def compute_match_score(row, mood, max_members):
 
 # Load the Data
 
-@st.cache_data
-def load_data():
-    df = pd.read_csv("data/cleaned_anime.csv")
-    df["rating"] = pd.to_numeric(df["rating"], errors="coerce").fillna(0.0)
-    df["members"] = pd.to_numeric(df.get("members", 0), errors="coerce").fillna(0).astype(int)
+DATA_FILE = "data/cleaned_anime.csv"
+CF_FILE = "data/cf_neighbours.npz"
+CACHE_DIR = ".cache/results"
+
+
+@st.cache_resource(max_entries=1)
+def load_version(stamp):
+    """Content hash of the data files, recomputed only when `stamp` changes."""
+    return dataset_version(DATA_FILE, CF_FILE)
+
+
+# `version` is only a cache key: everything loaded for one version is
+# reloaded together when the catalogue or CF neighbours change on disk,
+# and max_entries=1 releases the previous version's objects.
+@st.cache_data(max_entries=1)
+def load_data(version):
+    # validated at build time (scripts/validation.py): no coercion needed here
+    df = pd.read_csv(DATA_FILE, dtype={"episodes": "Int64"})
     df["genre_list"] = df["genre_list"].apply(fix_genre_list)
     return df
 
 
-df = load_data()
+@st.cache_resource(max_entries=1)
+def load_cf_neighbours(version):
+    """Item-item CF neighbours built by build_cf.py (optional)."""
+    if os.path.exists(CF_FILE):
+        return load_neighbours(CF_FILE)
+    return None
+
+
+@st.cache_resource(max_entries=1)
+def load_result_cache(version):
+    """Shared across sessions; a new dataset version gets a fresh cache."""
+    return ResultCache(version, cache_dir=CACHE_DIR)
+
+
+data_version = load_version(file_stamp(DATA_FILE, CF_FILE))
+df = load_data(data_version)
+cf_neighbours = load_cf_neighbours(data_version)
+result_cache = load_result_cache(data_version)
 MAX_MEMBERS = df["members"].max()
 
 
@@ -163,6 +211,8 @@ else:
     st.session_state.setdefault("surprise", False)
 
 st.sidebar.markdown("---")
+with st.sidebar.expander("Cache stats"):
+    st.json(result_cache.stats())
 st.sidebar.caption("Made with ❤️ by Nitin")
 
 
@@ -187,13 +237,21 @@ elif search_query.strip():
 # 3) Genre mode
 elif genre_filter:
     mask = df["genre_list"].apply(lambda gl: any(g in gl for g in genre_filter))
-    results = df[mask].sort_values("rating", ascending=False).head(top_n)
+    results = df[mask].sort_values("weighted_rating", ascending=False).head(top_n)
     mode_label = f"🎭 Genres: {', '.join(genre_filter)}"
 
 # 4) Mood mode
 else:
-    recs = recommend_by_mood(df, mood, top_n=top_n * 4, min_rating=min_rating)
-    results = build_explanations(recs, mood).head(top_n)
+    # over-fetch, then MMR picks a diverse top_n (one title per franchise)
+    recs = result_cache.get_or_compute(
+        "mood",
+        lambda: rerank_mmr(
+            recommend_by_mood(df, mood, top_n=top_n * 4, min_rating=min_rating),
+            top_n,
+        ),
+        mood=mood, top_n=top_n, min_rating=min_rating,
+    )
+    results = build_explanations(recs, mood)
     mode_label = f"✨ Recommended for {mood_emojis[mood]} {mood.capitalize()}"
 
 st.markdown(f"### {mode_label}")
@@ -207,14 +265,13 @@ else:
 
     for i, (_, row) in enumerate(results.iterrows()):
         with cols[i % 3]:
-            img = upscale_mal_image(row.get("image_url", ""))
-            st.image(img, width=260)
+            st.image(card_image(row.get("image_url", ""), 260), width=260)
 
             st.markdown(f"### {row['name']}")
 
             # Type + episodes
             typ = row.get("type", "N/A")
-            eps = row.get("episodes", "?")
+            eps = row["episodes"] if pd.notna(row["episodes"]) else "?"
             st.caption(f"`{typ}` · `{eps} eps`")
 
             # Genre badges
@@ -265,8 +322,7 @@ else:
     cols_f = st.columns(3)
     for i, (_, row) in enumerate(fav_df.iterrows()):
         with cols_f[i % 3]:
-            img = upscale_mal_image(row.get("image_url", ""))
-            st.image(img, width=220)
+            st.image(card_image(row.get("image_url", ""), 220), width=220)
             st.markdown(f"**{row['name']}**")
             st.caption(", ".join(row["genre_list"]))
             st.markdown(f"[Watch on Crunchyroll]({row['crunchyroll']})")
@@ -303,12 +359,12 @@ with col1:
 with col2:
     st.caption("Top rated anime")
 
-    top25 = df.sort_values("rating", ascending=False).head(25)
+    top25 = df.sort_values("weighted_rating", ascending=False).head(25)
 
     fig2 = px.bar(
         top25,
         x="name",
-        y="rating",
+        y="weighted_rating",
         title="Top 25 Highest Rated Anime",
     )
 
@@ -325,13 +381,16 @@ st.markdown("---")
 st.subheader("🔍 More Like This")
 
 selected = st.selectbox("Pick an anime you like:", df["name"].unique())
-similar = more_like_this(df, selected, top_n=6)
+similar = result_cache.get_or_compute(
+    "more_like_this",
+    lambda: more_like_this(df, selected, top_n=6, cf_neighbours=cf_neighbours),
+    name=selected, top_n=6,
+)
 
 cols2 = st.columns(3)
 for i, (_, row) in enumerate(similar.iterrows()):
     with cols2[i % 3]:
-        img = upscale_mal_image(row.get("image_url", ""))
-        st.image(img, width=220)
+        st.image(card_image(row.get("image_url", ""), 220), width=220)
         st.markdown(f"**{row['name']}**")
         st.caption(", ".join(row["genre_list"]))
         st.markdown(f"[Watch on Crunchyroll]({row['crunchyroll']})")
@@ -0,0 +1,19 @@
+import sys
+
+from scripts.collaborative import (
+    load_rating_matrix,
+    item_similarity_topk,
+    save_neighbours,
+)
+
+# MAL-style rating dump: user_id, anime_id, rating
+RATINGS_PATH = sys.argv[1] if len(sys.argv) > 1 else "data/rating.csv"
+OUT_PATH = "data/cf_neighbours.npz"
+
+ratings, user_ids, anime_ids = load_rating_matrix(RATINGS_PATH)
+print(f"Loaded {ratings.nnz:,} ratings from {len(user_ids):,} users on {len(anime_ids):,} anime")
+
+sim = item_similarity_topk(ratings)
+save_neighbours(OUT_PATH, sim, anime_ids)
+
+print(f"{OUT_PATH} created successfully")
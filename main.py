@@ -82,7 +82,7 @@ def run_cli():
     print_header()
 
     # Load dataset
-    df = load_anime(str(CSV_PATH))
+    df, _ = load_anime(str(CSV_PATH))
 
     # 1. Choose mood (by typing name)
     mood = choose_mood()
@@ -1,6 +1,9 @@
 from scripts.data_cleaning import load_anime
+from scripts.validation import format_report
 
-df = load_anime("data/anime_filtered.csv")
+df, report = load_anime("data/anime_filtered.csv", quarantine_path="data/quarantine.csv")
 df.to_csv("data/cleaned_anime.csv", index=False)
 
+print(format_report(report))
+
 print("cleaned_anime.csv created successfully")
\ No newline at end of file
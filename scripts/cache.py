@@ -0,0 +1,198 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+
+# -------------------------------------------------------------------
+# Defaults
+# -------------------------------------------------------------------
+MAX_MEMORY_BYTES = 64 * 1024 * 1024   # in-process LRU budget
+DISK_FILE = "results.sqlite"
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def dataset_version(*paths: str) -> str:
+    """
+    Content hash of the files a result depends on (catalogue, CF
+    neighbours, ...). Rebuilding any of them changes every cache key.
+    Missing paths are skipped.
+    """
+    h = hashlib.sha1()
+    for path in paths:
+        if not path or not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+    return h.hexdigest()[:16]
+
+
+def file_stamp(*paths: str) -> Tuple:
+    """
+    Cheap (path, mtime, size) fingerprint of the files, for deciding when
+    `dataset_version` has to be recomputed. Missing paths stamp as None.
+    """
+    stamps = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamps.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamps.append((path, None))
+    return tuple(stamps)
+
+
+def _sizeof(value: Any) -> int:
+    """Approximate in-memory size of a cached result."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+# -------------------------------------------------------------------
+# PUBLIC: two-level result cache
+# -------------------------------------------------------------------
+class ResultCache:
+    """
+    Recommendation result cache.
+
+    Level 1: in-process LRU, bounded by `max_bytes`.
+    Level 2 (optional): SQLite file under `cache_dir`, shared by every
+    worker pointing at the same directory.
+
+    Keys are (namespace, dataset version, params), so a catalogue rebuild
+    never serves stale results. Opening the disk tier deletes rows written
+    for any other version (counted as `stale_pruned`, separately from LRU
+    `evictions`).
+    """
+
+    def __init__(
+        self,
+        version: str,
+        max_bytes: int = MAX_MEMORY_BYTES,
+        cache_dir: Optional[str] = None,
+    ):
+        self.version = version
+        self.max_bytes = max_bytes
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "stale_pruned": 0,
+        }
+
+        self._db_path = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db_path = os.path.join(cache_dir, DISK_FILE)
+            self._open_disk()
+
+    # ---------- keys ----------
+    def key(self, namespace: str, **params) -> str:
+        raw = repr((namespace, self.version, sorted(params.items())))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    # ---------- disk tier ----------
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._db_path, timeout=5.0)
+
+    def _open_disk(self) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(results)")]
+            if columns and "version" not in columns:
+                conn.execute("DROP TABLE results")  # pre-versioning layout
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, version TEXT NOT NULL, value BLOB)"
+            )
+            stale = conn.execute("DELETE FROM results WHERE version != ?", (self.version,))
+            self._stats["stale_pruned"] += max(stale.rowcount, 0)
+
+    def _disk_get(self, key: str):
+        if not self._db_path:
+            return None
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def _disk_put(self, key: str, value: Any) -> None:
+        if not self._db_path:
+            return
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, version, value) VALUES (?, ?, ?)",
+                (key, self.version, blob),
+            )
+
+    # ---------- memory tier ----------
+    def _mem_put(self, key: str, value: Any) -> None:
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._lru:
+                self._bytes -= self._lru.pop(key)[1]
+            self._lru[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, old_size) = self._lru.popitem(last=False)
+                self._bytes -= old_size
+                self._stats["evictions"] += 1
+
+    # ---------- public API ----------
+    def get_or_compute(self, namespace: str, compute: Callable[[], Any], **params) -> Any:
+        """
+        Return the cached result for (namespace, params), calling
+        `compute()` and storing its result on a miss.
+        Callers get a copy of DataFrames so they can mutate freely.
+        """
+        key = self.key(namespace, **params)
+
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru.move_to_end(key)
+                self._stats["hits"] += 1
+
+        if entry is None:
+            value = self._disk_get(key)
+            if value is not None:
+                with self._lock:
+                    self._stats["disk_hits"] += 1
+            else:
+                value = compute()
+                with self._lock:
+                    self._stats["misses"] += 1
+                self._disk_put(key, value)
+            self._mem_put(key, value)
+        else:
+            value = entry[0]
+
+        return value.copy() if isinstance(value, pd.DataFrame) else value
+
+    def clear(self) -> None:
+        """Drop the in-process tier (the disk tier is pruned by version on open)."""
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus overall hit rate (memory + disk hits / lookups)."""
+        with self._lock:
+            out = dict(self._stats)
+            out["entries"] = len(self._lru)
+            out["bytes"] = self._bytes
+        lookups = out["hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = (out["hits"] + out["disk_hits"]) / lookups if lookups else 0.0
+        return out
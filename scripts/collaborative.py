@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Tuple
+
+
+# -------------------------------------------------------------------
+# Defaults (MyAnimeList-style rating dumps: user_id, anime_id, rating)
+# -------------------------------------------------------------------
+RATING_COLUMNS = ["user_id", "anime_id", "rating"]
+CHUNKSIZE = 1_000_000
+COMPACT_EVERY = 10          # merge buffered chunks into the CSR every N chunks
+BLOCK_SIZE = 512            # item rows per similarity block
+TOP_K = 50                  # neighbours kept per item
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def _grow_index(index: pd.Index, values: np.ndarray) -> Tuple[pd.Index, np.ndarray]:
+    """
+    Append unseen ids to `index` and return (index, positions of `values`).
+    """
+    pos = index.get_indexer(values)
+    missing = pos < 0
+    if missing.any():
+        index = index.append(pd.Index(pd.unique(values[missing])))
+        pos = index.get_indexer(values)
+    return index, pos
+
+
+def _merge(matrix: sparse.csr_matrix, rows, cols, vals, shape) -> sparse.csr_matrix:
+    """
+    Fold buffered COO triplets into the running CSR matrix.
+
+    Repeated (user, anime) pairs keep the last rating, both inside the
+    buffer and against entries stored by earlier merges.
+    """
+    rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+
+    keys = rows.astype(np.int64) * shape[1] + cols
+    _, last = np.unique(keys[::-1], return_index=True)
+    keep = len(keys) - 1 - last
+    del keys, last
+
+    block = sparse.csr_matrix(
+        (vals[keep], (rows[keep], cols[keep])),
+        shape=shape,
+        dtype=np.float32,
+    )
+    del rows, cols, vals, keep
+
+    matrix.resize(shape)
+    if matrix.nnz == 0:
+        return block
+    # last write wins: clear stored entries the new block overwrites
+    return matrix - matrix.multiply(block.astype(bool)) + block
+
+
+# -------------------------------------------------------------------
+# PUBLIC: streaming loader
+# -------------------------------------------------------------------
+def load_rating_matrix(
+    path: str,
+    chunksize: int = CHUNKSIZE,
+    min_rating: float = 1.0,
+) -> Tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """
+    Stream a user×anime rating dump into a CSR matrix (users × items).
+
+    The CSV is read in chunks; ids are mapped to dense positions as they
+    appear and triplets are folded into the CSR every COMPACT_EVERY chunks.
+    Each merge briefly holds the old matrix, its overwritten part and the
+    merged result, so peak memory is about three times the final matrix
+    plus the COMPACT_EVERY-chunk buffer.
+    Ratings below `min_rating` (MAL uses -1 for "watched, not rated") are
+    dropped.
+
+    Duplicate (user, anime) rows keep the last rating.
+
+    Returns (matrix, user_ids, anime_ids).
+    """
+    user_index = pd.Index([], dtype="int64")
+    item_index = pd.Index([], dtype="int64")
+    matrix = sparse.csr_matrix((0, 0), dtype=np.float32)
+    rows, cols, vals = [], [], []
+
+    reader = pd.read_csv(
+        path,
+        usecols=RATING_COLUMNS,
+        dtype={"user_id": "int64", "anime_id": "int64", "rating": "float32"},
+        chunksize=chunksize,
+    )
+
+    for n, chunk in enumerate(reader, start=1):
+        chunk = chunk[chunk["rating"] >= min_rating]
+        if chunk.empty:
+            continue
+
+        user_index, u_pos = _grow_index(user_index, chunk["user_id"].to_numpy())
+        item_index, i_pos = _grow_index(item_index, chunk["anime_id"].to_numpy())
+
+        rows.append(u_pos.astype(np.int32))
+        cols.append(i_pos.astype(np.int32))
+        vals.append(chunk["rating"].to_numpy(dtype=np.float32))
+
+        if n % COMPACT_EVERY == 0:
+            matrix = _merge(matrix, rows, cols, vals, (len(user_index), len(item_index)))
+            rows, cols, vals = [], [], []
+
+    if rows:
+        matrix = _merge(matrix, rows, cols, vals, (len(user_index), len(item_index)))
+
+    return matrix.tocsr(), user_index.to_numpy(), item_index.to_numpy()
+
+
+# -------------------------------------------------------------------
+# PUBLIC: item-item similarity
+# -------------------------------------------------------------------
+def item_similarity_topk(
+    ratings: sparse.csr_matrix,
+    k: int = TOP_K,
+    block_size: int = BLOCK_SIZE,
+) -> sparse.csr_matrix:
+    """
+    Adjusted-cosine item-item similarity, truncated to the top-k per item.
+
+    Ratings are centred on each user's mean, item vectors are L2-normalised
+    and the product X · Xᵀ is computed `block_size` item rows at a time, so
+    only a (block_size × n_items) dense slab is alive at once. Besides the
+    caller's `ratings`, at most two nnz-sized copies exist (during the
+    transpose); after that only the normalised item matrix is kept.
+
+    Returns an (n_items × n_items) CSR matrix with at most k entries per row.
+    """
+    # centre on user means (only the stored entries), on one working copy
+    centred = sparse.csr_matrix(ratings, dtype=np.float32, copy=True)
+    counts = np.diff(centred.indptr)
+    sums = np.asarray(centred.sum(axis=1)).ravel()
+    means = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+    centred.data -= np.repeat(means, counts).astype(np.float32)
+    del counts, sums, means
+
+    items = centred.T.tocsr()
+    del centred
+
+    # L2-normalise item rows in place
+    counts = np.diff(items.indptr)
+    squares = sparse.csr_matrix((items.data ** 2, items.indices, items.indptr), shape=items.shape)
+    norms = np.sqrt(np.asarray(squares.sum(axis=1)).ravel())
+    del squares
+    inv = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    items.data *= np.repeat(inv, counts).astype(np.float32)
+    del counts, norms, inv
+
+    items_t = items.T  # CSC view over the same buffers, no copy
+
+    n_items = items.shape[0]
+    k = min(k, max(n_items - 1, 0))
+    out_rows, out_cols, out_vals = [], [], []
+
+    for start in range(0, n_items, block_size):
+        stop = min(start + block_size, n_items)
+        block = (items[start:stop] @ items_t).toarray()
+        block[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # no self
+
+        if k == 0:
+            continue
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_vals = np.take_along_axis(block, top, axis=1)
+        keep = top_vals > 0
+
+        out_rows.append(np.nonzero(keep)[0].astype(np.int32) + start)
+        out_cols.append(top[keep].astype(np.int32))
+        out_vals.append(top_vals[keep].astype(np.float32))
+
+    if not out_rows:
+        return sparse.csr_matrix((n_items, n_items), dtype=np.float32)
+
+    return sparse.csr_matrix(
+        (np.concatenate(out_vals), (np.concatenate(out_rows), np.concatenate(out_cols))),
+        shape=(n_items, n_items),
+    )
+
+
+# -------------------------------------------------------------------
+# PUBLIC: persistence
+# -------------------------------------------------------------------
+def save_neighbours(path: str, sim: sparse.csr_matrix, anime_ids: np.ndarray) -> None:
+    """Persist a top-k similarity matrix together with its anime_id axis."""
+    np.savez_compressed(
+        path,
+        anime_ids=np.asarray(anime_ids, dtype=np.int64),
+        data=sim.data,
+        indices=sim.indices,
+        indptr=sim.indptr,
+    )
+
+
+def load_neighbours(path: str) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """Load what `save_neighbours` wrote. Returns (sim, anime_ids)."""
+    with np.load(path) as f:
+        anime_ids = f["anime_ids"]
+        n = len(anime_ids)
+        sim = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=(n, n))
+    return sim, anime_ids
+
+
+def cf_similarity(neighbours: Tuple[sparse.csr_matrix, np.ndarray], anime_id) -> pd.Series:
+    """
+    Collaborative-filtering neighbours of one anime as a Series
+    indexed by anime_id. Empty if the anime has no ratings.
+    """
+    sim, anime_ids = neighbours
+    pos = np.flatnonzero(anime_ids == anime_id)
+    if pos.size == 0:
+        return pd.Series(dtype="float32")
+
+    row = sim.getrow(pos[0])
+    return pd.Series(row.data, index=anime_ids[row.indices])
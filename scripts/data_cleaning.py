@@ -1,8 +1,18 @@
 import pandas as pd
+from typing import Dict, Optional, Tuple
 import requests
 import time
 import ast
 
+try:
+    from validation import validate_catalogue, format_report
+except ImportError:  # imported as scripts.data_cleaning
+    from scripts.validation import validate_catalogue, format_report
+
+# Bayesian (IMDB-style) weighted rating: titles need roughly this many
+# members before their own rating outweighs the catalogue mean.
+MIN_VOTES_QUANTILE = 0.25
+
 
 def get_image_url(name: str) -> str:
     try:
@@ -29,11 +39,64 @@ def split_genres(v):
     return []
 
 
-def load_anime(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+def weighted_rating(df: pd.DataFrame, quantile: float = MIN_VOTES_QUANTILE) -> pd.Series:
+    """
+    WR = v / (v + m) * R + m / (v + m) * C
+
+    v = members, R = rating, C = mean rating,
+    m = `quantile` of members across the catalogue.
+    """
+    v = df["members"].astype(float)
+    r = df["rating"].astype(float)
+    m = v.quantile(quantile)
+    c = r.mean()
+    total = v + m
+    return ((v / total) * r + (m / total) * c).fillna(c)
+
+
+def min_max(s: pd.Series) -> pd.Series:
+    """
+    Min–max normalize a numeric Series to [0, 1] (constant -> 0.5).
+    Shared by the stored score features and request-time scores.
+    """
+    if s.empty:
+        return s
+    lo, hi = s.min(), s.max()
+    if lo == hi:
+        return pd.Series(0.5, index=s.index)
+    return (s - lo) / (hi - lo)
+
+
+def add_score_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Precompute ranking features once per catalogue build:
+    weighted_rating, rating_norm (of weighted_rating) and members_norm.
+    """
+    df["weighted_rating"] = weighted_rating(df)
+    df["rating_norm"] = min_max(df["weighted_rating"])
+    df["members_norm"] = min_max(df["members"])
+    return df
+
 
-    df["rating"] = pd.to_numeric(df["rating"], errors="coerce").fillna(0)
-    df["members"] = df.get("members", 0).fillna(0).astype(int)
+def load_anime(
+    path: str,
+    quarantine_path: Optional[str] = None,
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Validate, enrich and return (catalogue, validation report) for `path`.
+    Rows failing validation are dropped. If `quarantine_path` is given they
+    are written there with a 'reason' column, and the formatted report goes
+    to `quarantine_path` + ".report.txt".
+    """
+    raw = pd.read_csv(path, dtype={"episodes": "string"})
+
+    df, quarantine, report = validate_catalogue(raw)
+    if quarantine_path:
+        quarantine.to_csv(quarantine_path, index=False)
+        with open(quarantine_path + ".report.txt", "w") as f:
+            f.write(format_report(report) + "\n")
+
+    df = add_score_features(df)
 
     df["genre_list"] = df["genre"].apply(split_genres)
     df["primary_genre"] = df["genre_list"].apply(lambda x: x[0] if x else "Unknown")
@@ -46,4 +109,4 @@ def load_anime(path: str) -> pd.DataFrame:
         time.sleep(1)
     df["image_url"] = urls
 
-    return df
+    return df, report
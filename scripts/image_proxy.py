@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from aiohttp import web
+from PIL import Image
+
+try:
+    from thumbs import ALLOWED_HOSTS, CARD_WIDTHS, check_url, snap_width
+except ImportError:  # imported as scripts.image_proxy
+    from scripts.thumbs import ALLOWED_HOSTS, CARD_WIDTHS, check_url, snap_width
+
+
+# -------------------------------------------------------------------
+# Defaults
+# -------------------------------------------------------------------
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+QUALITY = 82
+CACHE_DIR = ".cache/thumbs"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+FETCH_TIMEOUT = 10
+MAX_IMAGE_BYTES = 10 * 1024 * 1024   # posters are ~100 KB; refuse anything huge
+FAILURE_TTL = 60                     # seconds a failed URL is not refetched
+HOST = "127.0.0.1"
+PORT = 8502
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+class ImageTooLarge(Exception):
+    """Origin sent more than MAX_IMAGE_BYTES."""
+
+
+class RecentFailure(Exception):
+    """URL failed less than FAILURE_TTL seconds ago; not refetched yet."""
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _resize(data: bytes, width: int, fmt: str) -> bytes:
+    """Downscale to `width` (never upscale) and encode as `fmt`."""
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        if img.width > width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format=FORMATS[fmt], quality=QUALITY)
+        return buf.getvalue()
+
+
+# -------------------------------------------------------------------
+# PUBLIC: thumbnail store
+# -------------------------------------------------------------------
+class ThumbnailStore:
+    """
+    Content-addressed thumbnail cache on disk.
+
+    <cache_dir>/urls/<sha256(url)>          -> sha256 of the source image
+    <cache_dir>/blobs/<sha>/<width>.<fmt>   -> resized thumbnail
+
+    Each poster is fetched once; every (width, format) pair is rendered
+    from that single download. Concurrent requests for the same URL share
+    one in-flight fetch, and a URL whose fetch or decode failed is not
+    retried for FAILURE_TTL seconds.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        allowed_hosts=ALLOWED_HOSTS,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.allowed_hosts = set(allowed_hosts) if allowed_hosts else None
+        self.session = session
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._failures: Dict[str, float] = {}   # url -> monotonic retry time
+        self.fetches = 0
+        os.makedirs(os.path.join(cache_dir, "urls"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "blobs"), exist_ok=True)
+
+    # ---------- paths ----------
+    def _url_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, "urls", _sha256(url.encode("utf-8")))
+
+    def _blob_path(self, digest: str, width: int, fmt: str) -> str:
+        return os.path.join(self.cache_dir, "blobs", digest, f"{width}.{fmt}")
+
+    def _lookup(self, url: str) -> Optional[str]:
+        try:
+            with open(self._url_path(url)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        # write-then-rename so readers never see half a file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    # ---------- fetch + render ----------
+    def validate(self, url: str) -> None:
+        check_url(url, self.allowed_hosts)
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _fetch_and_render(self, url: str) -> str:
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        timeout = aiohttp.ClientTimeout(total=FETCH_TIMEOUT)
+        self.fetches += 1
+        async with self.session.get(url, timeout=timeout) as resp:
+            resp.raise_for_status()
+            if (resp.content_length or 0) > MAX_IMAGE_BYTES:
+                raise ImageTooLarge(url)
+            chunks, size = [], 0
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES:
+                    raise ImageTooLarge(url)
+                chunks.append(chunk)
+            data = b"".join(chunks)
+
+        digest = _sha256(data)
+        loop = asyncio.get_running_loop()
+        for width in CARD_WIDTHS:
+            for fmt in FORMATS:
+                path = self._blob_path(digest, width, fmt)
+                if not os.path.exists(path):
+                    thumb = await loop.run_in_executor(None, _resize, data, width, fmt)
+                    self._write(path, thumb)
+
+        self._write(self._url_path(url), digest.encode("ascii"))
+        return digest
+
+    async def _digest(self, url: str) -> str:
+        digest = self._lookup(url)
+        if digest:
+            return digest
+
+        retry_at = self._failures.get(url)
+        if retry_at is not None:
+            if time.monotonic() < retry_at:
+                raise RecentFailure(url)
+            del self._failures[url]
+
+        future = self._inflight.get(url)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch_and_render(url))
+            self._inflight[url] = future
+            future.add_done_callback(lambda f: self._done(url, f))
+        return await asyncio.shield(future)
+
+    def _done(self, url: str, future: asyncio.Future) -> None:
+        self._inflight.pop(url, None)
+        if not future.cancelled() and future.exception() is not None:
+            self._failures[url] = time.monotonic() + FAILURE_TTL
+
+    async def get(self, url: str, width: int, fmt: str = "webp"):
+        """Return (thumbnail bytes, etag) for `url` at a card width."""
+        self.validate(url)
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        width = snap_width(width)
+
+        digest = await self._digest(url)
+        with open(self._blob_path(digest, width, fmt), "rb") as f:
+            return f.read(), f"{digest[:32]}-{width}-{fmt}"
+
+
+# -------------------------------------------------------------------
+# PUBLIC: HTTP service
+# -------------------------------------------------------------------
+STORE = web.AppKey("store", ThumbnailStore)
+FALLBACK_ERRORS = (
+    aiohttp.ClientError,
+    asyncio.TimeoutError,
+    OSError,
+    Image.DecompressionBombError,
+    ImageTooLarge,
+    RecentFailure,
+)
+
+
+async def handle_thumb(request: web.Request) -> web.StreamResponse:
+    store: ThumbnailStore = request.app[STORE]
+    url = request.query.get("url", "")
+    fmt = request.query.get("fmt", "webp")
+    try:
+        width = int(request.query.get("w", CARD_WIDTHS[-1]))
+        data, etag = await store.get(url, width, fmt)
+    except ValueError as e:
+        raise web.HTTPBadRequest(text=str(e))
+    except FALLBACK_ERRORS:
+        # origin down, image too big or unreadable: let the browser try the original
+        raise web.HTTPFound(url)
+
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": f'"{etag}"'}
+    if request.headers.get("If-None-Match") == headers["ETag"]:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=data, content_type=f"image/{fmt}", headers=headers)
+
+
+def make_app(store: Optional[ThumbnailStore] = None) -> web.Application:
+    app = web.Application()
+    app[STORE] = store or ThumbnailStore()
+
+    async def _cleanup(app):
+        await app[STORE].close()
+
+    app.on_cleanup.append(_cleanup)
+    app.router.add_get("/thumb", handle_thumb)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(make_app(), host=HOST, port=PORT)
@@ -1,5 +1,15 @@
+import re
+
+import numpy as np
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, Optional, Tuple
+
+try:
+    from collaborative import cf_similarity
+    from data_cleaning import add_score_features, min_max
+except ImportError:  # imported as scripts.recommender
+    from scripts.collaborative import cf_similarity
+    from scripts.data_cleaning import add_score_features, min_max
 
 
 # -------------------------------------------------------------------
@@ -61,36 +71,86 @@ MOOD_GENRE_WEIGHTS: Dict[str, Dict[str, float]] = {
 # Helpers
 # -------------------------------------------------------------------
 def _normalize(s: pd.Series) -> pd.Series:
-    """Min–max normalize a numeric Series to [0, 1]."""
-    if s.empty:
-        return s
-    min_v = s.min()
-    max_v = s.max()
-    if min_v == max_v:
-        return pd.Series(0.5, index=s.index)
-    return (s - min_v) / (max_v - min_v)
-
-
-def _jaccard(a: List[str], b: List[str]) -> float:
-    """Jaccard similarity between two genre lists."""
-    set_a = set(g.lower() for g in a or [])
-    set_b = set(g.lower() for g in b or [])
-    if not set_a and not set_b:
-        return 0.0
-    inter = len(set_a & set_b)
-    union = len(set_a | set_b)
-    return inter / union if union else 0.0
+    """Min–max normalize a numeric Series to [0, 1] (same as the stored features)."""
+    return min_max(s)
+
+
+def _genre_matrix(df: pd.DataFrame) -> np.ndarray:
+    """Multi-hot (n × genres) matrix of lower-cased genre_list."""
+    lists = [[g.lower() for g in (gl or [])] for gl in df["genre_list"]]
+    vocab = {g: i for i, g in enumerate(sorted({g for gl in lists for g in gl}))}
+    mat = np.zeros((len(lists), len(vocab)), dtype=np.float32)
+    for row, gl in enumerate(lists):
+        mat[row, [vocab[g] for g in gl]] = 1.0
+    return mat
+
+
+def _similarity_arrays(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Arrays `_similarity_to` needs: genres, genre counts, primary genre, rating_norm."""
+    genres = _genre_matrix(df)
+    return (
+        genres,
+        genres.sum(axis=1),
+        df["primary_genre"].to_numpy(),
+        df["rating_norm"].to_numpy(dtype=float),
+    )
+
+
+def _similarity_to(arrays, pos: int) -> np.ndarray:
+    """
+    Similarity of every row to row `pos`:
+    0.5 * same primary_genre + 0.3 * genre Jaccard + 0.2 * rating similarity
+    """
+    genres, sizes, primary, rating_norm = arrays
+    inter = genres @ genres[pos]
+    union = sizes + sizes[pos] - inter
+    jaccard = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+
+    same_primary = (primary == primary[pos]).astype(float)
+    rating_sim = 1.0 - np.minimum(np.abs(rating_norm - rating_norm[pos]), 1.0)
+
+    return 0.5 * same_primary + 0.3 * jaccard + 0.2 * rating_sim
+
+
+# sequel / season markers, only ever stripped from the end of a title
+_FRANCHISE_NOISE = re.compile(
+    r"\d+(st|nd|rd|th)?|season|part|movie|ova|ona|specials?|final|r\d+|[ivx]+"
+)
+
+
+def _title_tokens(title: str) -> list:
+    return re.sub(r"[^\w\s]", " ", title.lower()).split()
+
+
+def franchise_key(name: str) -> str:
+    """
+    Rough franchise id from a title: the part before ':' with trailing
+    season / part / sequel-number tokens removed. Titles that are nothing
+    but such tokens ("X", "1989", "I: Wish You Were Here") keep their full
+    normalized title, so they don't collapse into one empty key.
+    "Shingeki no Kyojin Season 2" -> "shingeki no kyojin"
+    """
+    tokens = _title_tokens(str(name).split(":")[0])
+    while tokens and _FRANCHISE_NOISE.fullmatch(tokens[-1]):
+        tokens.pop()
+    if not tokens:
+        tokens = _title_tokens(str(name))
+    # symbol-only titles ("◯") have no word tokens at all
+    return " ".join(tokens) or str(name).strip().lower()
+
+
+SCORE_FEATURES = ["weighted_rating", "rating_norm", "members_norm"]
 
 
 def prepare_features(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Adds normalized rating & members columns.
-    Returns a copy.
+    Returns df with the precomputed score features.
+    They are stored in cleaned_anime.csv by data_cleaning; older
+    catalogues without them get them computed here (on a copy).
     """
-    out = df.copy()
-    out["rating_norm"] = _normalize(out["rating"])
-    out["members_norm"] = _normalize(out["members"])
-    return out
+    if all(c in df.columns for c in SCORE_FEATURES):
+        return df
+    return add_score_features(df.copy())
 
 
 # -------------------------------------------------------------------
@@ -146,6 +206,9 @@ def recommend_by_mood(
     Advanced recommender:
     final_score = 0.5 * mood_score + 0.3 * rating_norm + 0.2 * members_norm
 
+    rating_norm is the normalized Bayesian weighted rating, so
+    low-member titles can't win on a handful of perfect scores.
+
     Returns top_n rows sorted by final_score.
     """
     df_feat = prepare_features(df)
@@ -172,6 +235,8 @@ def more_like_this(
     df: pd.DataFrame,
     anime_name: str,
     top_n: int = 12,
+    cf_neighbours: Optional[tuple] = None,
+    cf_weight: float = 0.4,
 ) -> pd.DataFrame:
     """
     Find similar anime based on:
@@ -179,6 +244,10 @@ def more_like_this(
     - genre list overlap (Jaccard)
     - rating similarity
 
+    If `cf_neighbours` (from collaborative.load_neighbours) is given,
+    the content score is blended with item-item CF similarity:
+    (1 - cf_weight) * content + cf_weight * cf
+
     Returns a DataFrame with an extra 'similarity_score' column.
     """
     df_feat = prepare_features(df)
@@ -189,31 +258,72 @@ def more_like_this(
 
     target = target_rows.iloc[0]
 
-    sims = []
-    for idx, row in df_feat.iterrows():
-        if row["name"] == target["name"]:
-            continue
+    arrays = _similarity_arrays(df_feat)
+    pos = df_feat.index.get_loc(target.name)
+    sims = _similarity_to(arrays, pos)
 
-        same_primary = 1.0 if row["primary_genre"] == target["primary_genre"] else 0.0
-        genre_overlap = _jaccard(row.get("genre_list", []), target.get("genre_list", []))
+    scores = pd.Series(sims, index=df_feat.index)
+    scores = scores[(df_feat["name"] != target["name"]).to_numpy()]
 
-        rating_sim = 1.0 - min(abs(row["rating_norm"] - target["rating_norm"]), 1.0)
+    if cf_neighbours is not None and "anime_id" in df_feat.columns:
+        cf = cf_similarity(cf_neighbours, target["anime_id"])
+        if not cf.empty:
+            cf_scores = df_feat.loc[scores.index, "anime_id"].map(cf).fillna(0.0)
+            scores = (1 - cf_weight) * scores + cf_weight * cf_scores.clip(lower=0.0)
 
-        # Composite similarity score
-        sim_score = (
-            0.5 * same_primary +
-            0.3 * genre_overlap +
-            0.2 * rating_sim
-        )
+    scores = scores.sort_values(ascending=False, kind="stable").head(top_n)
 
-        sims.append((idx, sim_score))
+    similar_df = df_feat.loc[scores.index].copy()
+    similar_df["similarity_score"] = scores.values
 
-    sims_sorted = sorted(sims, key=lambda x: x[1], reverse=True)[:top_n]
+    return similar_df.sort_values("similarity_score", ascending=False)
 
-    similar_df = df_feat.loc[[idx for idx, _ in sims_sorted]].copy()
-    similar_df["similarity_score"] = [score for _, score in sims_sorted]
 
-    return similar_df.sort_values("similarity_score", ascending=False)
+# -------------------------------------------------------------------
+# PUBLIC: diversity re-ranking
+# -------------------------------------------------------------------
+def rerank_mmr(
+    recs: pd.DataFrame,
+    top_n: int,
+    lambda_: float = 0.7,
+    score_col: str = "final_score",
+    dedup_franchise: bool = True,
+) -> pd.DataFrame:
+    """
+    Maximal-marginal-relevance re-ranking of an over-fetched list.
+
+    Each step picks argmax(lambda_ * relevance - (1 - lambda_) * max_sim),
+    where max_sim is every candidate's highest similarity (same measure as
+    more_like_this) to anything already picked. max_sim is updated with one
+    vectorized row per pick, so the whole pass is O(top_n · n).
+
+    With dedup_franchise, only one title per `franchise_key` is kept.
+    """
+    if recs.empty or top_n <= 0:
+        return recs.head(0)
+
+    feat = prepare_features(recs)
+    arrays = _similarity_arrays(feat)
+    relevance = _normalize(feat[score_col].astype(float)).to_numpy()
+
+    n = len(feat)
+    max_sim = np.zeros(n)
+    available = np.ones(n, dtype=bool)
+    franchises = feat["name"].map(franchise_key).to_numpy() if dedup_franchise else None
+    picked = []
+
+    while len(picked) < min(top_n, n) and available.any():
+        mmr = lambda_ * relevance - (1 - lambda_) * max_sim
+        mmr[~available] = -np.inf
+        pos = int(np.argmax(mmr))
+        picked.append(pos)
+
+        available[pos] = False
+        if franchises is not None:
+            available &= franchises != franchises[pos]
+        np.maximum(max_sim, _similarity_to(arrays, pos), out=max_sim)
+
+    return recs.iloc[picked]
 
 
 # -------------------------------------------------------------------
@@ -0,0 +1,40 @@
+from urllib.parse import quote, urlparse
+
+
+# -------------------------------------------------------------------
+# Thumbnail proxy settings shared by app.py and image_proxy.py
+# (no third-party imports, so the app runs without aiohttp/Pillow)
+# -------------------------------------------------------------------
+CARD_WIDTHS = (220, 260)             # widths used by the cards in app.py
+ALLOWED_HOSTS = {"cdn.myanimelist.net", "myanimelist.cdn-dena.com", "i.imgur.com"}
+
+
+def snap_width(width: int) -> int:
+    """Smallest card width ≥ `width` (largest one if none)."""
+    for w in CARD_WIDTHS:
+        if width <= w:
+            return w
+    return CARD_WIDTHS[-1]
+
+
+def check_url(url: str, allowed_hosts=ALLOWED_HOSTS) -> None:
+    """Raise ValueError unless `url` is http(s) on an allowed host (None = any)."""
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise ValueError(f"Not an http(s) URL: {url}")
+    if allowed_hosts is not None and parsed.hostname not in allowed_hosts:
+        raise ValueError(f"Host not allowed: {parsed.hostname}")
+
+
+def is_proxied(url: str, allowed_hosts=ALLOWED_HOSTS) -> bool:
+    """True if the proxy would serve `url` (anything else should be hot-linked)."""
+    try:
+        check_url(url, allowed_hosts)
+    except ValueError:
+        return False
+    return True
+
+
+def thumb_url(proxy: str, url: str, width: int, fmt: str = "webp") -> str:
+    """URL of `url`'s thumbnail on the proxy running at `proxy`."""
+    return f"{proxy.rstrip('/')}/thumb?w={width}&fmt={fmt}&url={quote(url, safe='')}"
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Optional, Tuple
+
+
+# -------------------------------------------------------------------
+# Catalogue schema
+# -------------------------------------------------------------------
+REQUIRED_COLUMNS = ["anime_id", "name", "genre", "type", "episodes", "rating", "members"]
+RATING_RANGE = (0.0, 10.0)
+
+# every genre that appears in the MAL dump (data/anime.csv)
+GENRE_VOCAB = {
+    "Action", "Adventure", "Cars", "Comedy", "Dementia", "Demons", "Drama",
+    "Ecchi", "Fantasy", "Game", "Harem", "Hentai", "Historical", "Horror",
+    "Josei", "Kids", "Magic", "Martial Arts", "Mecha", "Military", "Music",
+    "Mystery", "Parody", "Police", "Psychological", "Romance", "Samurai",
+    "School", "Sci-Fi", "Seinen", "Shoujo", "Shoujo Ai", "Shounen",
+    "Shounen Ai", "Slice of Life", "Space", "Sports", "Super Power",
+    "Supernatural", "Thriller", "Vampire", "Yaoi", "Yuri",
+}
+
+
+# -------------------------------------------------------------------
+# Helpers
+# -------------------------------------------------------------------
+def _unknown_genres(genre: pd.Series, vocab: Iterable[str]) -> pd.Series:
+    """
+    True where any comma-separated genre is outside `vocab`.
+    Genre strings repeat heavily, so only the distinct values are split.
+    """
+    codes, uniques = pd.factorize(genre)
+    tokens = pd.Series(uniques).str.split(",").explode().str.strip()
+    bad_unique = (~tokens.isin(set(vocab))).groupby(level=0).any().to_numpy()
+    bad = np.zeros(len(genre), dtype=bool)
+    known = codes >= 0
+    bad[known] = bad_unique[codes[known]]
+    return pd.Series(bad, index=genre.index)
+
+
+# -------------------------------------------------------------------
+# PUBLIC: validation stage
+# -------------------------------------------------------------------
+def validate_catalogue(
+    df: pd.DataFrame,
+    genre_vocab: Optional[Iterable[str]] = GENRE_VOCAB,
+) -> Tuple[pd.DataFrame, pd.DataFrame, Dict[str, int]]:
+    """
+    Vectorized data-quality checks for a raw catalogue.
+
+    Every check is a boolean mask over the whole frame; a row failing
+    any of them goes to quarantine with a ';'-joined 'reason'.
+    Valid rows come back with typed columns:
+    anime_id/members int, rating float, episodes nullable Int64
+    ("Unknown" = still airing → <NA>).
+
+    Duplicate titles (case-insensitive) are quarantined after the first
+    one even when their anime_id differs, e.g. an OVA and a Movie that
+    share a name. That is intended: the app uses `name` as the key for
+    favorites, widget keys and "More Like This".
+
+    Returns (clean, quarantine, report) where report maps each check
+    to the number of rows it flagged, plus row totals.
+    """
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f"Catalogue is missing columns: {', '.join(missing)}")
+
+    df = df.reset_index(drop=True)
+    anime_id = pd.to_numeric(df["anime_id"], errors="coerce")
+    rating = pd.to_numeric(df["rating"], errors="coerce")
+    members = pd.to_numeric(df["members"], errors="coerce")
+    episodes_raw = df["episodes"].astype("string").str.strip()
+    episodes = pd.to_numeric(episodes_raw.where(episodes_raw != "Unknown"), errors="coerce")
+    name = df["name"].astype("string").str.strip()
+    genre = df["genre"].astype("string")
+
+    checks = {
+        "bad_anime_id": anime_id.isna() | (anime_id <= 0) | (anime_id % 1 != 0),
+        "missing_name": name.isna() | (name == ""),
+        "missing_genre": genre.isna() | (genre.str.strip() == ""),
+        "bad_rating": rating.isna() | ~rating.between(*RATING_RANGE),
+        "bad_members": members.isna() | (members < 0) | (members % 1 != 0),
+        "bad_episodes": (
+            episodes_raw.notna() & (episodes_raw != "Unknown")
+            & (episodes.isna() | (episodes < 1) | (episodes % 1 != 0))
+        ),
+        "duplicate_anime_id": anime_id.notna() & anime_id.duplicated(keep="first"),
+        "duplicate_name": name.notna() & name.str.lower().duplicated(keep="first"),
+    }
+    if genre_vocab is not None:
+        checks["unknown_genre"] = _unknown_genres(genre, genre_vocab)
+
+    flags = pd.DataFrame({k: v.fillna(True).to_numpy(dtype=bool) for k, v in checks.items()})
+    bad = flags.any(axis=1).to_numpy()
+
+    hit = flags[bad]
+    reason = np.full(len(hit), "", dtype=object)
+    for check in hit.columns:
+        reason = reason + np.where(hit[check].to_numpy(), f"{check};", "")
+    quarantine = df[bad].copy()
+    quarantine["reason"] = pd.Series(reason, index=quarantine.index, dtype=object).str.rstrip(";")
+
+    clean = df[~bad].copy()
+    clean["anime_id"] = anime_id[~bad].astype("int64")
+    clean["name"] = name[~bad]
+    clean["rating"] = rating[~bad].astype(float)
+    clean["members"] = members[~bad].astype("int64")
+    clean["episodes"] = episodes[~bad].astype("Int64")
+
+    report = {k: int(v) for k, v in flags.sum().items()}
+    report["rows"] = len(df)
+    report["valid"] = len(clean)
+    report["quarantined"] = len(quarantine)
+
+    return clean.reset_index(drop=True), quarantine, report
+
+
+def format_report(report: Dict[str, int]) -> str:
+    """Plain-text summary of a validate_catalogue report."""
+    lines = [
+        f"Validated {report['rows']:,} rows: "
+        f"{report['valid']:,} valid, {report['quarantined']:,} quarantined"
+    ]
+    for check, count in report.items():
+        if check in ("rows", "valid", "quarantined") or not count:
+            continue
+        lines.append(f"  - {check}: {count:,}")
+    return "\n".join(lines)
@@ -0,0 +1,90 @@
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from cache import DISK_FILE, ResultCache, _sizeof  # noqa: E402
+
+
+def _frame(i):
+    return pd.DataFrame({"anime_id": [i, i + 1], "name": [f"a{i}", f"b{i}"]})
+
+
+def test_counts_hits_and_misses():
+    cache = ResultCache("v1")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return _frame(1)
+
+    first = cache.get_or_compute("mood", compute, mood="happy", top_n=6)
+    second = cache.get_or_compute("mood", compute, mood="happy", top_n=6)
+    cache.get_or_compute("mood", compute, mood="sad", top_n=6)
+
+    assert len(calls) == 2
+    pd.testing.assert_frame_equal(first, second)
+    stats = cache.stats()
+    assert (stats["hits"], stats["disk_hits"], stats["misses"]) == (1, 0, 2)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_returns_copies():
+    cache = ResultCache("v1")
+    out = cache.get_or_compute("mood", lambda: _frame(1), mood="happy")
+    out["name"] = "changed"
+    again = cache.get_or_compute("mood", lambda: _frame(1), mood="happy")
+    assert list(again["name"]) == ["a1", "b1"]
+
+
+def test_lru_evicts_least_recently_used_by_bytes():
+    size = _sizeof(_frame(0))
+    cache = ResultCache("v1", max_bytes=size * 2)
+
+    cache.get_or_compute("x", lambda: _frame(0), i=0)
+    cache.get_or_compute("x", lambda: _frame(1), i=1)
+    cache.get_or_compute("x", lambda: _frame(0), i=0)      # 0 is now most recent
+    cache.get_or_compute("x", lambda: _frame(2), i=2)      # evicts 1
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 2
+    assert stats["bytes"] <= cache.max_bytes
+
+    cache.get_or_compute("x", lambda: _frame(0), i=0)
+    assert cache.stats()["hits"] == 2
+    cache.get_or_compute("x", lambda: _frame(1), i=1)
+    assert cache.stats()["misses"] == 4
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    writer = ResultCache("v1", cache_dir=str(tmp_path))
+    writer.get_or_compute("mood", lambda: _frame(1), mood="happy")
+
+    reader = ResultCache("v1", cache_dir=str(tmp_path))
+    out = reader.get_or_compute("mood", lambda: 1 / 0, mood="happy")
+
+    pd.testing.assert_frame_equal(out, _frame(1))
+    assert reader.stats()["disk_hits"] == 1
+    assert reader.stats()["misses"] == 0
+
+
+def test_open_prunes_other_versions(tmp_path):
+    old = ResultCache("v1", cache_dir=str(tmp_path))
+    for i in range(6):
+        old.get_or_compute("x", lambda: _frame(i), i=i)
+
+    new = ResultCache("v2", cache_dir=str(tmp_path))
+    new.get_or_compute("x", lambda: _frame(0), i=0)
+
+    stats = new.stats()
+    assert stats["stale_pruned"] == 6
+    assert stats["evictions"] == 0
+    assert stats["misses"] == 1
+
+    with sqlite3.connect(os.path.join(str(tmp_path), DISK_FILE)) as conn:
+        rows = conn.execute("SELECT version, COUNT(*) FROM results GROUP BY version").fetchall()
+    assert rows == [("v2", 1)]
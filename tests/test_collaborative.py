@@ -0,0 +1,70 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import collaborative  # noqa: E402
+from collaborative import item_similarity_topk, load_rating_matrix  # noqa: E402
+
+
+def _dump(tmp_path, n_rows=3000, n_users=60, n_items=40, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = pd.DataFrame({
+        "user_id": rng.integers(1, n_users + 1, n_rows),
+        "anime_id": rng.integers(100, 100 + n_items, n_rows),
+        "rating": rng.integers(-1, 11, n_rows),
+    })
+    path = tmp_path / "rating.csv"
+    ratings.to_csv(path, index=False)
+    return path, ratings
+
+
+def _adjusted_cosine(dense):
+    """Dense reference: centre stored ratings on user means, cosine of item columns."""
+    stored = dense > 0
+    means = dense.sum(axis=1) / np.maximum(stored.sum(axis=1), 1)
+    centred = np.where(stored, dense - means[:, None], 0.0)
+    norms = np.linalg.norm(centred, axis=0)
+    norms[norms == 0] = 1.0
+    unit = centred / norms
+    sim = unit.T @ unit
+    np.fill_diagonal(sim, 0.0)
+    return sim
+
+
+def test_duplicates_across_buffers_keep_last_rating(tmp_path, monkeypatch):
+    monkeypatch.setattr(collaborative, "COMPACT_EVERY", 3)
+    path, ratings = _dump(tmp_path)
+
+    matrix, user_ids, anime_ids = load_rating_matrix(str(path), chunksize=50)
+
+    assert matrix.data.max() <= 10
+    last = ratings[ratings["rating"] >= 1].drop_duplicates(["user_id", "anime_id"], keep="last")
+    assert matrix.nnz == len(last)
+
+    users = {u: i for i, u in enumerate(user_ids)}
+    items = {a: i for i, a in enumerate(anime_ids)}
+    dense = matrix.toarray()
+    for row in last.itertuples():
+        assert dense[users[row.user_id], items[row.anime_id]] == row.rating
+
+
+def test_topk_matches_dense_adjusted_cosine(tmp_path, monkeypatch):
+    monkeypatch.setattr(collaborative, "COMPACT_EVERY", 3)
+    path, _ = _dump(tmp_path, seed=1)
+    matrix, _, _ = load_rating_matrix(str(path), chunksize=50)
+
+    k = 5
+    sim = item_similarity_topk(matrix, k=k, block_size=7).toarray()
+    ref = _adjusted_cosine(matrix.toarray().astype(float))
+
+    for i in range(ref.shape[0]):
+        kept = np.flatnonzero(sim[i])
+        assert len(kept) <= k
+        np.testing.assert_allclose(sim[i, kept], ref[i, kept], rtol=1e-4, atol=1e-5)
+
+        expected = np.sort(ref[i][ref[i] > 0])[::-1][:k]
+        np.testing.assert_allclose(np.sort(sim[i, kept])[::-1], expected, rtol=1e-4, atol=1e-5)
@@ -0,0 +1,171 @@
+import asyncio
+import io
+import os
+import sys
+
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import image_proxy  # noqa: E402
+from image_proxy import CACHE_CONTROL, ThumbnailStore, make_app  # noqa: E402
+from thumbs import is_proxied, thumb_url  # noqa: E402
+
+
+def _poster() -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (600, 900), "red").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _run(tmp_path, scenario):
+    """
+    Start a stand-in origin on 127.0.0.1 (/poster.jpg, /chunked.jpg,
+    /broken.jpg) and the proxy in front of it, then run
+    `scenario(session, proxy, origin, state)`.
+    """
+    state = {"hits": 0, "broken_hits": 0}
+
+    async def poster(request):
+        state["hits"] += 1
+        await asyncio.sleep(0.05)  # keep concurrent requests overlapping
+        return web.Response(body=_poster(), content_type="image/jpeg")
+
+    async def chunked(request):
+        # no Content-Length, so the proxy has to enforce its cap while reading
+        resp = web.StreamResponse(headers={"Content-Type": "image/jpeg"})
+        resp.enable_chunked_encoding()
+        await resp.prepare(request)
+        await resp.write(_poster())
+        await resp.write_eof()
+        return resp
+
+    async def broken(request):
+        state["broken_hits"] += 1
+        return web.Response(body=b"not an image", content_type="image/jpeg")
+
+    async def main():
+        origin_app = web.Application()
+        origin_app.router.add_get("/poster.jpg", poster)
+        origin_app.router.add_get("/chunked.jpg", chunked)
+        origin_app.router.add_get("/broken.jpg", broken)
+        origin = TestServer(origin_app, host="127.0.0.1")
+        await origin.start_server()
+
+        store = ThumbnailStore(str(tmp_path / "thumbs"), allowed_hosts={"127.0.0.1"})
+        proxy = TestServer(make_app(store), host="127.0.0.1")
+        await proxy.start_server()
+
+        try:
+            async with ClientSession() as session:
+                await scenario(session, str(proxy.make_url("/")), origin, state)
+        finally:
+            await proxy.close()
+            await origin.close()
+
+    asyncio.run(main())
+    return state
+
+
+def test_concurrent_requests_fetch_origin_once(tmp_path):
+    async def scenario(session, proxy, origin, state):
+        url = thumb_url(proxy, str(origin.make_url("/poster.jpg")), 220)
+        responses = await asyncio.gather(*[session.get(url) for _ in range(10)])
+        try:
+            assert [r.status for r in responses] == [200] * 10
+        finally:
+            for r in responses:
+                r.release()
+
+    state = _run(tmp_path, scenario)
+    assert state["hits"] == 1
+
+
+def test_serves_webp_at_card_width_with_long_cache(tmp_path):
+    async def scenario(session, proxy, origin, state):
+        url = thumb_url(proxy, str(origin.make_url("/poster.jpg")), 220)
+        async with session.get(url) as resp:
+            assert resp.status == 200
+            assert resp.content_type == "image/webp"
+            assert resp.headers["Cache-Control"] == CACHE_CONTROL
+            assert "immutable" in resp.headers["Cache-Control"]
+            img = Image.open(io.BytesIO(await resp.read()))
+            assert img.format == "WEBP"
+            assert img.size == (220, 330)
+
+    _run(tmp_path, scenario)
+
+
+def test_if_none_match_returns_304(tmp_path):
+    async def scenario(session, proxy, origin, state):
+        url = thumb_url(proxy, str(origin.make_url("/poster.jpg")), 220)
+        async with session.get(url) as resp:
+            etag = resp.headers["ETag"]
+        async with session.get(url, headers={"If-None-Match": etag}) as resp:
+            assert resp.status == 304
+
+    _run(tmp_path, scenario)
+
+
+def test_host_outside_allow_list_is_rejected(tmp_path):
+    async def scenario(session, proxy, origin, state):
+        url = thumb_url(proxy, "https://example.com/poster.jpg", 220)
+        async with session.get(url) as resp:
+            assert resp.status == 400
+
+    state = _run(tmp_path, scenario)
+    assert state["hits"] == 0
+
+
+def test_undecodable_body_redirects_to_original(tmp_path):
+    async def scenario(session, proxy, origin, state):
+        original = str(origin.make_url("/broken.jpg"))
+        async with session.get(thumb_url(proxy, original, 220), allow_redirects=False) as resp:
+            assert resp.status == 302
+            assert resp.headers["Location"] == original
+
+    _run(tmp_path, scenario)
+
+
+def test_failed_url_is_not_refetched_immediately(tmp_path):
+    async def scenario(session, proxy, origin, state):
+        original = str(origin.make_url("/broken.jpg"))
+        for _ in range(3):
+            async with session.get(thumb_url(proxy, original, 220), allow_redirects=False) as resp:
+                assert resp.status == 302
+
+    state = _run(tmp_path, scenario)
+    assert state["broken_hits"] == 1
+
+
+def test_oversized_body_redirects_to_original(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_proxy, "MAX_IMAGE_BYTES", 1000)
+
+    async def scenario(session, proxy, origin, state):
+        for path in ("/poster.jpg", "/chunked.jpg"):
+            original = str(origin.make_url(path))
+            async with session.get(thumb_url(proxy, original, 220), allow_redirects=False) as resp:
+                assert resp.status == 302
+                assert resp.headers["Location"] == original
+
+    _run(tmp_path, scenario)
+
+
+def test_decompression_bomb_redirects_to_original(tmp_path, monkeypatch):
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+
+    async def scenario(session, proxy, origin, state):
+        original = str(origin.make_url("/poster.jpg"))
+        async with session.get(thumb_url(proxy, original, 220), allow_redirects=False) as resp:
+            assert resp.status == 302
+            assert resp.headers["Location"] == original
+
+    _run(tmp_path, scenario)
+
+
+def test_is_proxied_skips_hosts_outside_allow_list():
+    assert is_proxied("https://cdn.myanimelist.net/images/anime/10/47347l.jpg")
+    assert not is_proxied("https://via.placeholder.com/300x450?text=No+Image")
+    assert not is_proxied("not a url")
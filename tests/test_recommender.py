@@ -0,0 +1,62 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from recommender import franchise_key, rerank_mmr  # noqa: E402
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Shingeki no Kyojin Season 2", "shingeki no kyojin"),
+    ("Fate/Zero 2nd Season", "fate zero"),
+    ("Code Geass: Hangyaku no Lelouch R2", "code geass"),
+    ("Final Fantasy VII: Advent Children", "final fantasy"),
+    # titles made only of sequel-looking tokens keep their full title
+    ("X", "x"),
+    ("X/1999", "x 1999"),
+    ("009-1", "009 1"),
+    ("1989", "1989"),
+    ("vivi", "vivi"),
+    ("I: Wish You Were Here", "i wish you were here"),
+    ("◯", "◯"),
+])
+def test_franchise_key(name, key):
+    assert franchise_key(name) == key
+
+
+def _recs(names):
+    n = len(names)
+    return pd.DataFrame({
+        "name": names,
+        "genre_list": [["Action", "Drama"]] * n,
+        "primary_genre": ["Action"] * n,
+        "rating": [8.0] * n,
+        "members": [100_000] * n,
+        "final_score": [1.0 - i / n for i in range(n)],
+    })
+
+
+def test_rerank_mmr_keeps_one_title_per_franchise():
+    recs = _recs([
+        "Shingeki no Kyojin",
+        "Shingeki no Kyojin Season 2",
+        "X",
+        "1989",
+        "2010",
+        "vivi",
+        "Shingeki no Kyojin: Kuinaki Sentaku",
+    ])
+
+    picked = rerank_mmr(recs, top_n=len(recs))["name"].tolist()
+
+    assert picked[0] == "Shingeki no Kyojin"
+    assert sorted(picked) == sorted(["Shingeki no Kyojin", "X", "1989", "2010", "vivi"])
+
+
+def test_rerank_mmr_without_dedup_keeps_everything():
+    recs = _recs(["Shingeki no Kyojin", "Shingeki no Kyojin Season 2", "X"])
+    picked = rerank_mmr(recs, top_n=3, dedup_franchise=False)
+    assert len(picked) == 3
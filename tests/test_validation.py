@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from validation import validate_catalogue  # noqa: E402
+
+
+def _catalogue():
+    return pd.DataFrame([
+        # anime_id, name, genre, type, episodes, rating, members
+        (1, "Death Note", "Mystery, Thriller", "TV", "37", "8.71", 1013917),
+        (2, "One Piece", "Action, Adventure", "TV", "Unknown", "8.58", 504862),
+        (3, "Bad Rating", "Comedy", "TV", "12", "n/a", 1000),
+        (1, "Another Death", "Drama", "TV", "12", "7.5", 1000),
+        (5, "death note", "Drama", "Movie", "1", "7.0", 1000),
+        (6, "Odd Genre", "Comedy, Cooking", "TV", "12", "7.0", 1000),
+    ], columns=["anime_id", "name", "genre", "type", "episodes", "rating", "members"])
+
+
+def test_routes_bad_rows_to_quarantine_with_reason():
+    clean, quarantine, report = validate_catalogue(_catalogue())
+
+    reasons = dict(zip(quarantine["name"], quarantine["reason"]))
+    assert reasons == {
+        "Bad Rating": "bad_rating",
+        "Another Death": "duplicate_anime_id",
+        "death note": "duplicate_name",
+        "Odd Genre": "unknown_genre",
+    }
+    assert clean["name"].tolist() == ["Death Note", "One Piece"]
+    assert (report["rows"], report["valid"], report["quarantined"]) == (6, 2, 4)
+
+
+def test_unknown_episodes_become_missing_not_quarantined():
+    clean, _, _ = validate_catalogue(_catalogue())
+
+    one_piece = clean.set_index("name").loc["One Piece"]
+    assert pd.isna(one_piece["episodes"])
+    assert str(clean["episodes"].dtype) == "Int64"
+    assert clean["rating"].dtype == float
+
+
+def test_missing_column_raises():
+    with pytest.raises(ValueError, match="members"):
+        validate_catalogue(_catalogue().drop(columns=["members"]))